@@ -1,3 +1,4 @@
+import hmac
 import inspect
 import json
 import logging
@@ -73,8 +74,12 @@ class Evazan AIDB:
         return hashed.decode(self.ENCODING)
 
     def check_password(self, password, hashed):
-        # Check if the provided password matches the hash
-        return bcrypt.checkpw(password.encode(), hashed.encode(self.ENCODING))
+        # Check if the provided password matches the hash.
+        # Re-hash with the stored salt, then compare in constant time so the
+        # comparison can't leak hash prefixes through early-exit timing.
+        hashed_bytes = hashed.encode(self.ENCODING)
+        candidate = bcrypt.hashpw(password.encode(), hashed_bytes)
+        return hmac.compare_digest(candidate, hashed_bytes)
 
     def generate_token(self, user_id, token_type="access", expiry_hours=1):
         """Generate a new token for the user. There are three types of tokens:
@@ -197,9 +202,17 @@ class Evazan AIDB:
         # (or a list of a single None if it was a non-fetch query)
         return results
 
+    # Precomputed per-table SQL for token validation; this is the hottest query
+    # in the API (it runs once per authenticated request), so don't rebuild the
+    # statement string on every call.
+    _TOKEN_SELECT_CMDS = {
+        table: f"SELECT user_id FROM {table} WHERE user_id = %s AND token = %s;"
+        for table in ("access_tokens", "refresh_tokens", "reset_tokens")
+    }
+
     def _validate_token_in_db(self, user_id: str, token: str, table: str) -> bool:
         try:
-            select_cmd = f"SELECT user_id FROM {table} WHERE user_id = %s AND token = %s;"
+            select_cmd = self._TOKEN_SELECT_CMDS[table]
             # Note: the "[0]" is added here because `select_cmd` is not a list
             result = self._execute_query(select_cmd, (user_id, token), "one")[0]
             return result is not None
@@ -579,6 +592,50 @@ class Evazan AIDB:
             logger.warning(f"Warning (possbile error): {e}")
             return {}
 
+    def append_message_and_get_thread_llm(self, user_id, thread_id, role, content, tool_name=None):
+        """Append a message and retrieve the updated thread for the LLM.
+
+        Equivalent to append_message() followed by get_thread_llm(), but runs
+        all four statements on a single connection/transaction, so the hot
+        add-message path pays one pool checkout and one commit instead of two.
+        """
+        try:
+            # TODO(odyash): check if "function" can be renamed to
+            # "tool" like the rest of the codebase or not
+            insert_cmd = (
+                "INSERT INTO messages (thread_id, user_id, role, content, function_name) " + "VALUES (%s, %s, %s, %s, %s);"
+            )
+            # Appending a message should update the thread's updated_at field.
+            update_cmd = "UPDATE threads SET updated_at = now() WHERE id = %s AND user_id = %s;"
+            select_cmd_1 = (
+                "SELECT role, content, function_name FROM messages "
+                + "WHERE thread_id = %s AND user_id = %s ORDER BY timestamp;"
+            )
+            select_cmd_2 = """SELECT name FROM threads WHERE id = %s AND user_id = %s;"""
+            params = (thread_id, user_id)
+
+            _, _, result, thread_name_result = self._execute_query(
+                [insert_cmd, update_cmd, select_cmd_1, select_cmd_2],
+                [(thread_id, user_id, role, content, tool_name), params, params, params],
+                ["", "", "all", "one"],
+                commit_after="all",
+            )
+
+            if not thread_name_result:
+                raise HTTPException(
+                    status_code=401,
+                    detail="Incorrect user_id or thread_id.",
+                )
+            thread_name = thread_name_result[0]
+            retval = {
+                "thread_name": thread_name,
+                "messages": [self.convert_message_llm(x) for x in result],
+            }
+            return retval
+        except Exception as e:
+            logger.warning(f"Warning (possbile error): {e}")
+            return {}
+
     def get_thread_llm_whatsapp(self, thread_id: str, user_id_whatsapp: int) -> list[dict]:
         """
         Retrieves the message history for a given WhatsApp thread.
@@ -635,6 +692,42 @@ class Evazan AIDB:
             logger.warning(f"Warning (possbile error): {e}")
             return None, None
 
+    def get_user_and_last_message_time_whatsapp(
+        self, phone_num: str
+    ) -> tuple[Optional[int], Optional[str], Optional[datetime]]:
+        """
+        Retrieves a WhatsApp user's ID together with their latest thread's ID
+        and last message time in a single query.
+
+        Equivalent to retrieve_user_info_whatsapp(phone_num, "id") followed by
+        get_last_message_time_whatsapp(), but in one DB round-trip.
+
+        Args:
+            phone_num (str): The phone number of the user.
+
+        Returns:
+            tuple[Optional[int], Optional[str], Optional[datetime]]: A tuple of
+                (user_id_whatsapp, thread_id, last_message_time); the thread
+                fields are None if the user has no threads yet, and all three
+                are None if the user is not found.
+        """
+        try:
+            select_cmd = """
+            SELECT u.id, t.id, t.updated_at
+            FROM users_whatsapp u
+            LEFT JOIN threads_whatsapp t ON t.user_id_whatsapp = u.id
+            WHERE u.phone_num = %s
+            ORDER BY t.updated_at DESC NULLS LAST
+            LIMIT 1;
+            """
+            result = self._execute_query(select_cmd, (phone_num,), "one")[0]
+            if result:
+                return result[0], result[1], result[2]
+            return None, None, None
+        except Exception as e:
+            logger.warning(f"Warning (possbile error): {e}")
+            return None, None, None
+
     def snapshot_thread(self, thread_id, user_id):
         """Snapshot a thread at the current time and make it
         shareable with another user.
@@ -722,9 +815,12 @@ class Evazan AIDB:
 
     def logout(self, user_id, token):
         try:
-            for db_table in ["access_tokens", "refresh_tokens"]:
-                delete_cmd = f"""DELETE FROM {db_table} WHERE user_id = %s AND token = %s;"""
-                self._execute_query(delete_cmd, (user_id, token))
+            # Delete from both token tables in a single round-trip/commit.
+            delete_cmds = [
+                f"""DELETE FROM {db_table} WHERE user_id = %s AND token = %s;"""
+                for db_table in ["access_tokens", "refresh_tokens"]
+            ]
+            self._execute_query(delete_cmds, [(user_id, token)] * len(delete_cmds), commit_after="all")
             return {"status": "success"}
         except Exception as e:
             logger.warning(f"Warning (possbile error): {e}")
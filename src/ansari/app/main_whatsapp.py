@@ -1,3 +1,4 @@
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse
 
@@ -74,8 +75,20 @@ async def main_webhook(request: Request, cors_ok: bool = Depends(validate_cors))
     if not cors_ok:
         raise HTTPException(status_code=403, detail="CORS not permitted")
 
-    # Wait for the incoming webhook message to be received as JSON
-    data = await request.json()
+    # Wait for the incoming webhook message to be received
+    raw_body = await request.body()
+
+    # Meta posts a delivery/read receipt for every message we send, so status
+    # updates are the most frequent payload this webhook sees. They carry a
+    # "statuses" key where real messages carry "messages", so a raw-bytes scan
+    # drops them before paying for JSON parsing at all. (A user text that
+    # happens to contain '"statuses"' still arrives under a "messages" key,
+    # so it can't be misclassified.)
+    if b'"statuses"' in raw_body and b'"messages"' not in raw_body:
+        return
+
+    # Parse with orjson (faster than the stdlib decoder request.json() uses)
+    data = orjson.loads(raw_body)
 
     # # Logging the origin (host) of the incoming webhook message
     # logger.debug(f"ORIGIN of the incoming webhook message: {json.dumps(request, indent=4)}")
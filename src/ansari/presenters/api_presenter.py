@@ -1,22 +1,112 @@
 import copy
+import threading
 
 from fastapi.responses import StreamingResponse
 from langfuse.decorators import observe
 
 from evazan_ai.agents import Evazan AI
+from evazan_ai.evazan_ai_logger import get_logger
+
+logger = get_logger()
+
+# How long a follower waits for its leader's stream to finish before treating
+# the entry as wedged and falling back to a fresh completion. Generous enough
+# for a slow LLM response, short enough not to pin threadpool threads forever.
+_FOLLOW_TIMEOUT_SECONDS = 120.0
+
+
+class _InFlightResponse:
+    """Buffers a streamed response so identical concurrent requests can replay it."""
+
+    def __init__(self):
+        self.tokens = []
+        self.done = threading.Event()
 
 
 class ApiPresenter:
     def __init__(self, app, agent):
         self.app = app
         self.agent: Evazan AI = agent
+        # Single-flight bookkeeping: maps (thread_id, last user message) to the
+        # in-flight response being generated for it.
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+    def _single_flight_key(self, messages, message_logger):
+        thread_id = getattr(message_logger, "thread_id", None)
+        last_user_msg = messages["messages"][-1]["content"] if messages["messages"] else ""
+        return (str(thread_id), last_user_msg)
+
+    def _fresh_agent(self, message_logger):
+        # A shallow copy is enough here: the copy only needs its own
+        # message_logger/message_history slots (both reassigned below), while the
+        # expensive immutable state (tools, prompts, settings) can be shared.
+        # deepcopy was re-building all of that on every streamed response.
+        agent = copy.copy(self.agent)
+        agent.set_message_logger(message_logger)
+        return agent
 
     @observe()
     def complete(self, messages, message_logger=None):
-        print("Complete called.")
-        agent = copy.deepcopy(self.agent)
-        agent.set_message_logger(message_logger)
-        return StreamingResponse(agent.replace_message_history(messages["messages"]))
+        logger.debug("Complete called.")
+        if message_logger is None:
+            # No thread to scope the key on (e.g. the stateless /api/v1/complete
+            # route), so coalescing would match unrelated requests that merely
+            # share the same last message text. Stream directly instead.
+            agent = self._fresh_agent(message_logger)
+            return StreamingResponse(agent.replace_message_history(messages["messages"]))
+
+        key = self._single_flight_key(messages, message_logger)
+        with self._in_flight_lock:
+            entry = self._in_flight.get(key)
+            is_leader = entry is None
+            if is_leader:
+                entry = _InFlightResponse()
+                self._in_flight[key] = entry
+
+        if not is_leader:
+            # A duplicate (e.g. double-submit) of a request that's already being
+            # answered: replay the leader's buffered tokens instead of paying
+            # for a second LLM call.
+            def follow():
+                if entry.done.wait(timeout=_FOLLOW_TIMEOUT_SECONDS):
+                    yield from entry.tokens
+                    return
+                # The leader never finished - most likely its response was
+                # dropped before the stream was iterated, so lead()'s cleanup
+                # never ran. Clear the wedged entry (unless someone already
+                # replaced it) and answer this request with a fresh completion
+                # instead of blocking forever.
+                with self._in_flight_lock:
+                    if self._in_flight.get(key) is entry:
+                        del self._in_flight[key]
+                agent = self._fresh_agent(message_logger)
+                yield from agent.replace_message_history(messages["messages"])
+
+            return StreamingResponse(follow())
+
+        try:
+            agent = self._fresh_agent(message_logger)
+        except Exception:
+            # lead()'s finally only runs once the generator is iterated, so a
+            # failure here would otherwise leave the entry in place and park
+            # every retry in follow() until the timeout.
+            entry.done.set()
+            with self._in_flight_lock:
+                self._in_flight.pop(key, None)
+            raise
+
+        def lead():
+            try:
+                for token in agent.replace_message_history(messages["messages"]):
+                    entry.tokens.append(token)
+                    yield token
+            finally:
+                entry.done.set()
+                with self._in_flight_lock:
+                    self._in_flight.pop(key, None)
+
+        return StreamingResponse(lead())
 
     def present(self):
         pass
@@ -1,8 +1,11 @@
+import asyncio
 import copy
+import time
 from datetime import datetime
 from typing import Any, Literal
 
 import httpx
+import orjson
 
 from evazan_ai.agents.evazan_ai import Evazan AI
 from evazan_ai.evazan_ai_db import Evazan AIDB, MessageLogger
@@ -17,8 +20,85 @@ logger = get_logger()
 #    instead of duplicating `db` instances? Will this cost more resources?
 db = Evazan AIDB(get_settings())
 
+# One shared client for all outgoing Meta API calls: keeps the TLS connection
+# pool alive between messages instead of re-handshaking per send.
+httpx_client = httpx.AsyncClient(timeout=30.0)
+
+
+class _TTLCache:
+    """Minimal TTL cache for per-user lookups on the WhatsApp hot path."""
+
+    def __init__(self, ttl_seconds: float, max_size: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._data = {}
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() > expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    def set(self, key, value):
+        # Delete-and-reinsert so dict insertion order tracks how recently each
+        # key was set; without this, re-setting an active key left it in its
+        # original slot and eviction dropped the busiest entries first.
+        self._data.pop(key, None)
+        if len(self._data) >= self.max_size:
+            now = time.monotonic()
+            for old_key in [k for k, (expires_at, _) in self._data.items() if expires_at <= now]:
+                del self._data[old_key]
+            if len(self._data) >= self.max_size:
+                # Still full after dropping expired entries: evict the least
+                # recently set half.
+                for old_key in list(self._data)[: self.max_size // 2]:
+                    del self._data[old_key]
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+
+
+# A user's DB id never changes once registered, so it can be cached for a
+# while. Thread metadata (latest thread id + last message time) is only
+# advanced by this process, which refreshes the entry after every message it
+# stores; the short TTL bounds staleness across workers.
+_user_id_cache = _TTLCache(ttl_seconds=600)
+_thread_meta_cache = _TTLCache(ttl_seconds=60)
+# Only positive existence results are cached: registration is permanent, so a
+# hit can never go stale, while unknown numbers still hit the DB.
+_known_users_cache = _TTLCache(ttl_seconds=3600)
+
+# Don't flush a streamed chunk to the user before it has grown at least this
+# many characters (and reached a paragraph break); avoids a flood of
+# one-line WhatsApp messages for short answers.
+_STREAM_FLUSH_MIN_CHARS = 500
+
+# (upper bound in seconds, divisor, unit) for the retention log line; scanned
+# in order, first matching bound wins.
+_PASSED_TIME_UNITS = (
+    (60, 1, "sec"),
+    (3600, 60, "mins"),
+    (86400, 3600, "hours"),
+    (float("inf"), 86400, "days"),
+)
+
+
+def _format_passed_time(passed_time: float) -> str:
+    for upper_bound, divisor, unit in _PASSED_TIME_UNITS:
+        if passed_time < upper_bound:
+            return f"{passed_time / divisor:.1f}{unit}"
+    # Only reachable for inf (the no-previous-thread sentinel): inf < inf is
+    # False, so fall through to the largest unit.
+    return f"{passed_time / 86400:.1f}days"
+
 
 class WhatsAppPresenter:
+    # Constant part of the Meta send-message payload; the per-message fields
+    # ("to", "text") are filled in send_whatsapp_message.
+    _MSG_SKELETON = {"messaging_product": "whatsapp"}
+
     def __init__(
         self,
         agent: Evazan AI,
@@ -29,6 +109,11 @@ class WhatsAppPresenter:
         self.agent = agent
         self.access_token = access_token
         self.meta_api_url = f"https://graph.facebook.com/{api_version}/{business_phone_number_id}/messages"
+        # The auth header never changes, so build it once instead of per send
+        self.headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json",
+        }
 
     async def extract_relevant_whatsapp_message_details(
         self,
@@ -47,6 +132,15 @@ class WhatsAppPresenter:
         """
         # logger.debug(f"Received payload from WhatsApp user:\n{body}")
 
+        # A non-dict payload would make the key lookups below raise TypeError;
+        # turn it into the same structured error as any other malformed body.
+        if not isinstance(body, dict):
+            error_msg = f"Invalid received payload from WhatsApp user and/or problem with Meta's API :\n{body}"
+            logger.error(
+                error_msg,
+            )
+            raise Exception(error_msg)
+
         if not (
             body.get("object")
             and (entry := body.get("entry", []))
@@ -81,8 +175,9 @@ class WhatsAppPresenter:
         # Extract the phone number of the WhatsApp sender
         from_whatsapp_number = incoming_msg["from"]
         # Meta API note: Meta sends "errors" key when receiving unsupported message types
-        # (e.g., video notes, gifs sent from giphy, or polls)
-        incoming_msg_type = incoming_msg["type"] if incoming_msg["type"] in incoming_msg.keys() else "errors"
+        # (e.g., video notes, gifs sent from giphy, or polls), i.e. the value of
+        # "type" is normally itself a key of the message holding the payload
+        incoming_msg_type = incoming_msg["type"] if incoming_msg["type"] in incoming_msg else "errors"
         # Extract the message of the WhatsApp sender (could be text, image, etc.)
         incoming_msg_body = incoming_msg[incoming_msg_type]
 
@@ -113,7 +208,10 @@ class WhatsAppPresenter:
             None
         """
         # Check if the user's phone number is stored in users_whatsapp table
+        if _known_users_cache.get(from_whatsapp_number):
+            return True
         if db.account_exists_whatsapp(phone_num=from_whatsapp_number):
+            _known_users_cache.set(from_whatsapp_number, True)
             return True
 
         # Else, register the user with the detected language
@@ -129,6 +227,7 @@ class WhatsAppPresenter:
         ]
         if status == "success":
             logger.info(f"Registered new whatsapp user (lang: {user_lang})!: {from_whatsapp_number}")
+            _known_users_cache.set(from_whatsapp_number, True)
             return True
         else:
             logger.error(f"Failed to register new whatsapp user: {from_whatsapp_number}")
@@ -147,23 +246,19 @@ class WhatsAppPresenter:
 
         """
         url = self.meta_api_url
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
-        }
         json_data = {
-            "messaging_product": "whatsapp",
+            **self._MSG_SKELETON,
             "to": from_whatsapp_number,
             "text": {"body": msg_body},
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, json=json_data)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            if msg_body != "...":
-                logger.info(
-                    f"Evazan AI responsded to WhatsApp user: {from_whatsapp_number} with:\n{msg_body}",
-                )
+        # Serialize with orjson rather than httpx's stdlib-json `json=` path
+        response = await httpx_client.post(url, headers=self.headers, content=orjson.dumps(json_data))
+        response.raise_for_status()  # Raise an exception for HTTP errors
+        if msg_body != "...":
+            logger.info(
+                f"Evazan AI responsded to WhatsApp user: {from_whatsapp_number} with:\n{msg_body}",
+            )
 
     async def handle_text_message(
         self,
@@ -180,12 +275,23 @@ class WhatsAppPresenter:
         try:
             logger.info(f"Whatsapp user said: {incoming_txt_msg}")
 
-            # Get user's ID from users_whatsapp table
+            # Get user's ID and latest-thread details (thread with latest
+            # updated_at column) from the cache, or with one joined query on a
+            # cold cache.
             # Note we're not checking for user's existence here, as we've already done that in `main_webhook()`
-            user_id_whatsapp = db.retrieve_user_info_whatsapp(from_whatsapp_number, "id")[0]
-
-            # Get details of thread with latest updated_at column
-            thread_id, last_message_time = db.get_last_message_time_whatsapp(user_id_whatsapp)
+            user_id_whatsapp = _user_id_cache.get(from_whatsapp_number)
+            thread_meta = _thread_meta_cache.get(from_whatsapp_number)
+            if user_id_whatsapp is None or thread_meta is None:
+                # DB calls are blocking psycopg2 round-trips; run them off the
+                # event loop so one user's message doesn't stall the webhook
+                # for everyone else (same below)
+                user_id_whatsapp, thread_id, last_message_time = await asyncio.to_thread(
+                    db.get_user_and_last_message_time_whatsapp,
+                    from_whatsapp_number,
+                )
+                _user_id_cache.set(from_whatsapp_number, user_id_whatsapp)
+                thread_meta = (thread_id, last_message_time)
+            thread_id, last_message_time = thread_meta
 
             # Calculate the time passed since the last message
             if last_message_time is None:
@@ -194,15 +300,8 @@ class WhatsAppPresenter:
                 passed_time = (datetime.now() - last_message_time).total_seconds()
 
             # Log the time passed since the last message
-            if passed_time < 60:
-                passed_time_log = f"{passed_time:.1f}sec"
-            elif passed_time < 3600:
-                passed_time_log = f"{passed_time / 60:.1f}mins"
-            elif passed_time < 86400:
-                passed_time_log = f"{passed_time / 3600:.1f}hours"
-            else:
-                passed_time_log = f"{passed_time / 86400:.1f}days"
-            logger.debug(f"Time passed since user ({user_id_whatsapp})'s last whatsapp message: {passed_time_log}mins")
+            passed_time_log = _format_passed_time(passed_time)
+            logger.debug(f"Time passed since user ({user_id_whatsapp})'s last whatsapp message: {passed_time_log}")
 
             # Determine the allowed retention time
             if get_settings().DEBUG_MODE:
@@ -214,37 +313,56 @@ class WhatsAppPresenter:
             # Create a new thread if X hours have passed since last message
             if thread_id is None or passed_time > allowed_time:
                 first_few_words = " ".join(incoming_txt_msg.split()[:6])
-                thread_id = db.create_thread_whatsapp(user_id_whatsapp, first_few_words)
+                thread_id = await asyncio.to_thread(db.create_thread_whatsapp, user_id_whatsapp, first_few_words)
                 logger.info(
                     f"Created a new thread for the whatsapp user ({user_id_whatsapp}), "
                     + "as the allowed retention time has passed."
                 )
 
             # Store incoming message to current thread it's assigned to
-            db.append_message_whatsapp(user_id_whatsapp, thread_id, {"role": "user", "content": incoming_txt_msg})
+            await asyncio.to_thread(
+                db.append_message_whatsapp, user_id_whatsapp, thread_id, {"role": "user", "content": incoming_txt_msg}
+            )
+            _thread_meta_cache.set(from_whatsapp_number, (thread_id, datetime.now()))
 
             # Get `message_history` from current thread (including incoming message)
-            message_history = db.get_thread_llm_whatsapp(thread_id, user_id_whatsapp)
-            message_history_for_debugging = [msg for msg in message_history if msg["role"] in {"user", "assistant"}]
+            message_history = await asyncio.to_thread(db.get_thread_llm_whatsapp, thread_id, user_id_whatsapp)
             # Note: obviously, this log output won't consider Evazan AI's response, as it still happens later in the code below
-            logger.debug(
-                f"#msgs (user/assistant only) retrieved for user ({user_id_whatsapp})'s current whatsapp thread: "
-                + str(len(message_history_for_debugging))
+            # lazy=True defers the history scan until a DEBUG sink actually consumes it
+            logger.opt(lazy=True).debug(
+                "#msgs (user/assistant only) retrieved for user ({})'s current whatsapp thread: {}",
+                lambda: user_id_whatsapp,
+                lambda: sum(1 for msg in message_history if msg["role"] in {"user", "assistant"}),
             )
 
             # Setting up `MessageLogger` for Evazan AI, so it can log (i.e., store) its response to the DB
-            agent = copy.deepcopy(self.agent)
+            # A shallow copy suffices: the copy gets its own message_logger and
+            # message_history (both reassigned before use), while the expensive
+            # immutable state (tools, prompts, settings) stays shared. deepcopy
+            # was rebuilding all of that for every incoming message.
+            agent = copy.copy(self.agent)
             agent.set_message_logger(MessageLogger(db, user_id_whatsapp, thread_id, to_whatsapp=True))
 
-            # Get final response from Evazan AI by sending `message_history`
-            # TODO(odyash, good_first_issue): change `stream` to False (and remove comprehensive loop)
-            #   when `Evazan AI` is capable of handling it
-            response = [tok for tok in agent.replace_message_history(message_history, stream=True) if tok]
-            response = "".join(response)
-
-            if response:
-                await self.send_whatsapp_message(from_whatsapp_number, response)
-            else:
+            # Get the response from Evazan AI by sending `message_history`.
+            # Meta's API has no token-level streaming into a single message, so
+            # flush paragraph-sized chunks as separate messages while the model
+            # is still generating: the user starts reading a long answer while
+            # the rest is produced instead of waiting for the full buffer.
+            buffer = ""
+            sent_anything = False
+            for tok in agent.replace_message_history(message_history, stream=True):
+                if not tok:
+                    continue
+                buffer += tok
+                if len(buffer) >= _STREAM_FLUSH_MIN_CHARS and "\n\n" in buffer:
+                    chunk, _, buffer = buffer.rpartition("\n\n")
+                    if chunk.strip():
+                        await self.send_whatsapp_message(from_whatsapp_number, chunk.strip())
+                        sent_anything = True
+
+            if buffer.strip():
+                await self.send_whatsapp_message(from_whatsapp_number, buffer.strip())
+            elif not sent_anything:
                 logger.warning("Response was empty. Sending error message.")
                 await self.send_whatsapp_message(
                     from_whatsapp_number,
@@ -1,13 +1,20 @@
-import requests
+import httpx
+import orjson
 
 KALEMAT_BASE_URL = "https://api.kalimat.dev/search"
 TOOL_NAME = "search_hadith"
 
+# Shared across SearchHadith instances (the agent is copied per request);
+# httpx pools connections per client, so one module-level client keeps a
+# single warm TCP+TLS connection to the Kalimat API process-wide.
+httpx_client = httpx.Client(timeout=30.0)
+
 
 class SearchHadith:
     def __init__(self, kalimat_api_key):
         self.api_key = kalimat_api_key
         self.base_url = KALEMAT_BASE_URL
+        self.headers = {"x-api-key": self.api_key}
 
     def get_tool_description(self):
         return {
@@ -32,7 +39,6 @@ class SearchHadith:
         return TOOL_NAME
 
     def run(self, query: str, num_results: int = 5):
-        headers = {"x-api-key": self.api_key}
         payload = {
             "query": query,
             "numResults": num_results,
@@ -40,24 +46,28 @@ class SearchHadith:
             "getText": 2,
         }
 
-        response = requests.get(self.base_url, headers=headers, params=payload)
+        response = httpx_client.get(self.base_url, headers=self.headers, params=payload)
 
         if response.status_code != 200:
             print(
-                f"Query failed with code {response.status_code}, reason {response.reason}, text {response.text}",
+                f"Query failed with code {response.status_code}, reason {response.reason_phrase}, text {response.text}",
             )
             response.raise_for_status()
 
-        return response.json()
+        # orjson decodes the result list faster than the stdlib decoder
+        # behind response.json()
+        return orjson.loads(response.content)
 
     def pp_hadith(self, h):
-        en = h["en_text"]
         grade = h["grade_en"].strip()
         if grade:
             grade = f"\nGrade: {grade}\n"
-        src = f"Collection: {h['source_book']} Chapter: {h['chapter_number']} Hadith: {h['hadith_number']} LK id: {h['id']}"
-        result = f"{src}\n{en}\n{grade}"
-        return result
+        # Single f-string so CPython builds the result in one pass instead of
+        # formatting intermediate pieces and concatenating them
+        return (
+            f"Collection: {h['source_book']} Chapter: {h['chapter_number']} "
+            f"Hadith: {h['hadith_number']} LK id: {h['id']}\n{h['en_text']}\n{grade}"
+        )
 
     def run_as_list(self, query: str, num_results: int = 3):
         print(f'Searching hadith for "{query}"')
@@ -1,15 +1,26 @@
+from functools import lru_cache
+
 from fastapi import Depends, HTTPException, Request
 from jwt import PyJWTError
-from langdetect import detect
+from langdetect import DetectorFactory, detect
 
 from evazan_ai.evazan_ai_logger import get_logger
 from evazan_ai.config import Settings, get_settings
 
 logger = get_logger()
 
+# langdetect is non-deterministic by default (its profiles are probabilistic);
+# pinning the seed makes repeated detections stable, which also lets us
+# memoize them below.
+DetectorFactory.seed = 0
+
 
-def get_extended_origins(settings: Settings = Depends(get_settings)):
-    origins = get_settings().ORIGINS
+@lru_cache
+def get_extended_origins():
+    # Computed once per process: the origin list only depends on settings,
+    # which are fixed at startup. Copy so the appends below don't mutate the
+    # cached Settings.ORIGINS list itself.
+    origins = list(get_settings().ORIGINS)
 
     # This if condition only runs in local development
     # Also, if we don't execute the code below, we'll get a "400 Bad Request" error when
@@ -32,11 +43,19 @@ def get_extended_origins(settings: Settings = Depends(get_settings)):
     return origins
 
 
+@lru_cache
+def _get_origins_set() -> frozenset:
+    """Extended origins as a frozenset, computed once: validate_cors runs on
+    every request, so it shouldn't rebuild the origin list (or scan it) each time.
+    """
+    return frozenset(get_extended_origins())
+
+
 # Defined in a separate file to avoid circular imports between main_*.py files
 def validate_cors(request: Request, settings: Settings = Depends(get_settings)) -> bool:
     try:
         # logger.debug(f"Headers of raw request are: {request.headers}")
-        origins = get_extended_origins()
+        origins = _get_origins_set()
         incoming_origin = [
             request.headers.get("origin", ""),  # If coming from evazan_ai's frontend website
             request.headers.get("host", ""),  # If coming from Meta's WhatsApp API
@@ -52,6 +71,16 @@ def validate_cors(request: Request, settings: Settings = Depends(get_settings))
         raise HTTPException(status_code=403, detail="Could not validate credentials")
 
 
+# Delete-table for bytes.translate: every byte in [65, 122], so
+# len(text) - len(translated) counts the in-range characters in C instead of
+# a per-character Python loop.
+_ENGLISH_RANGE_BYTES = bytes(range(65, 123))
+
+# str.translate equivalent (codepoint -> None deletes) for non-ASCII strings,
+# where the bytes path above doesn't apply.
+_ENGLISH_RANGE_TABLE = dict.fromkeys(range(65, 123))
+
+
 def _check_if_mostly_english(text: str, threshold: float = 0.8):
     """
     Check if the majority of characters in the input string lie within the ASCII range 65 to 122.
@@ -71,7 +100,10 @@ def _check_if_mostly_english(text: str, threshold: float = 0.8):
         return False  # If the string is empty, return False
 
     # Count characters within the ASCII range 65 to 122
-    count_in_range = sum(1 for char in text if 65 <= ord(char) <= 122)
+    if text.isascii():
+        count_in_range = total_chars - len(text.encode().translate(None, _ENGLISH_RANGE_BYTES))
+    else:
+        count_in_range = total_chars - len(text.translate(_ENGLISH_RANGE_TABLE))
 
     # Calculate the percentage of characters in range
     percentage_in_range = count_in_range / total_chars
@@ -91,17 +123,31 @@ def get_language_from_text(text: str) -> str:
 
     """
 
-    if len(text) < 45 and _check_if_mostly_english(text):
+    if len(text) < 45:
         # If user starts with small phrases like "Al salamu Alyykom",
         # they get translated to "tl/id/etc." for some reason,
         # so default to "en" in this case
-        logger.debug("Defaulting to English due to short English text")
-        return "en"
+        if text.isascii():
+            # Pure ASCII can't be anything langdetect would get right on a
+            # string this short; skip the character scan and the detector.
+            logger.debug("Defaulting to English due to short ASCII text")
+            return "en"
+        if _check_if_mostly_english(text):
+            logger.debug("Defaulting to English due to short English text")
+            return "en"
 
     try:
-        detected_lang = detect(text)
+        detected_lang = _detect_language(text)
     except Exception as e:
         logger.error(f'Error detecting language (so will return "en" instead): {e}')
         return "en"
 
     return detected_lang
+
+
+@lru_cache(maxsize=1024)
+def _detect_language(text: str) -> str:
+    """Memoized langdetect call: detection is O(text) probabilistic profile
+    matching, and repeated inputs (common greetings) are frequent.
+    """
+    return detect(text)
@@ -0,0 +1,148 @@
+import pytest
+
+from evazan_ai.presenters import api_presenter
+from evazan_ai.presenters.api_presenter import ApiPresenter
+
+
+class FakeAgent:
+    """Stands in for the LLM agent: replays a fixed token stream and counts calls."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        # A list so the count is shared with the shallow copies complete() makes
+        self.calls = []
+
+    def set_message_logger(self, message_logger):
+        self.message_logger = message_logger
+
+    def replace_message_history(self, message_history):
+        self.calls.append(message_history)
+        yield from self.tokens
+
+
+class FakeMessageLogger:
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+
+
+def make_messages(content):
+    return {"messages": [{"role": "user", "content": content}]}
+
+
+async def collect(response):
+    """Drains a StreamingResponse's body iterator into a list of tokens."""
+    return [token async for token in response.body_iterator]
+
+
+@pytest.mark.asyncio
+async def test_leader_streams_and_cleans_up():
+    agent = FakeAgent(["a", "b", "c"])
+    presenter = ApiPresenter(None, agent)
+
+    response = presenter.complete(make_messages("hi"), message_logger=FakeMessageLogger(1))
+    assert len(presenter._in_flight) == 1
+
+    assert await collect(response) == ["a", "b", "c"]
+    assert len(agent.calls) == 1
+    # The entry must be removed once the leader finishes streaming
+    assert presenter._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_follower_replays_leader_tokens_without_second_call():
+    agent = FakeAgent(["a", "b", "c"])
+    presenter = ApiPresenter(None, agent)
+    messages = make_messages("hi")
+
+    leader = presenter.complete(messages, message_logger=FakeMessageLogger(1))
+    follower = presenter.complete(messages, message_logger=FakeMessageLogger(1))
+
+    assert await collect(leader) == ["a", "b", "c"]
+    assert await collect(follower) == ["a", "b", "c"]
+    # Only the leader hit the agent; the follower replayed its buffer
+    assert len(agent.calls) == 1
+    assert presenter._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_distinct_threads_are_not_coalesced():
+    agent = FakeAgent(["x"])
+    presenter = ApiPresenter(None, agent)
+    messages = make_messages("hi")
+
+    first = presenter.complete(messages, message_logger=FakeMessageLogger(1))
+    second = presenter.complete(messages, message_logger=FakeMessageLogger(2))
+    assert len(presenter._in_flight) == 2
+
+    assert await collect(first) == ["x"]
+    assert await collect(second) == ["x"]
+    assert len(agent.calls) == 2
+    assert presenter._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_no_message_logger_bypasses_single_flight():
+    agent = FakeAgent(["x"])
+    presenter = ApiPresenter(None, agent)
+    messages = make_messages("hi")
+
+    # Without a message logger there is no thread to key on, so identical
+    # texts from unrelated users must each get their own completion.
+    first = presenter.complete(messages)
+    second = presenter.complete(messages)
+    assert presenter._in_flight == {}
+
+    assert await collect(first) == ["x"]
+    assert await collect(second) == ["x"]
+    assert len(agent.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_leader_failure_still_clears_entry():
+    class FailingAgent(FakeAgent):
+        def replace_message_history(self, message_history):
+            self.calls.append(message_history)
+            yield "a"
+            raise RuntimeError("boom")
+
+    presenter = ApiPresenter(None, FailingAgent([]))
+
+    response = presenter.complete(make_messages("hi"), message_logger=FakeMessageLogger(1))
+    with pytest.raises(RuntimeError):
+        await collect(response)
+
+    # A crashed leader must not leave a stale entry that later requests
+    # would wait on forever
+    assert presenter._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_setup_failure_after_insertion_clears_entry():
+    class BrokenAgent(FakeAgent):
+        def set_message_logger(self, message_logger):
+            raise RuntimeError("boom")
+
+    presenter = ApiPresenter(None, BrokenAgent(["x"]))
+
+    with pytest.raises(RuntimeError):
+        presenter.complete(make_messages("hi"), message_logger=FakeMessageLogger(1))
+
+    # Failing between the entry insertion and the first iteration must still
+    # remove the entry, or every retry would become a blocked follower
+    assert presenter._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_follower_falls_back_when_leader_never_streams(monkeypatch):
+    monkeypatch.setattr(api_presenter, "_FOLLOW_TIMEOUT_SECONDS", 0.01)
+    agent = FakeAgent(["x"])
+    presenter = ApiPresenter(None, agent)
+    messages = make_messages("hi")
+
+    # The leader's response is never iterated, so its cleanup never runs
+    presenter.complete(messages, message_logger=FakeMessageLogger(1))
+    follower = presenter.complete(messages, message_logger=FakeMessageLogger(1))
+
+    assert await collect(follower) == ["x"]
+    assert len(agent.calls) == 1
+    assert presenter._in_flight == {}
@@ -0,0 +1,126 @@
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from evazan_ai.app.main_api import validate_password_strength
+from evazan_ai.presenters.whatsapp_presenter import _TTLCache, _format_passed_time
+from evazan_ai.util.general_helpers import _check_if_mostly_english
+
+
+class TestTTLCache:
+    def test_get_returns_stored_value(self):
+        cache = _TTLCache(ttl_seconds=60)
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+
+    def test_missing_key_returns_none(self):
+        cache = _TTLCache(ttl_seconds=60)
+        assert cache.get("key") is None
+
+    def test_expired_entry_is_dropped(self):
+        cache = _TTLCache(ttl_seconds=0.01)
+        cache.set("key", "value")
+        time.sleep(0.05)
+        assert cache.get("key") is None
+
+    def test_reset_refreshes_the_ttl(self):
+        cache = _TTLCache(ttl_seconds=0.1)
+        cache.set("key", "old")
+        time.sleep(0.06)
+        cache.set("key", "new")
+        time.sleep(0.06)
+        # The second set restarted the clock, so the entry is still live
+        assert cache.get("key") == "new"
+
+    def test_eviction_keeps_recently_set_keys(self):
+        cache = _TTLCache(ttl_seconds=60, max_size=4)
+        for key in ("a", "b", "c", "d"):
+            cache.set(key, key)
+
+        # Re-setting "a" must move it to the recent end, so the next eviction
+        # drops "b" and "c" (the least recently set half), not "a"
+        cache.set("a", "a2")
+        cache.set("e", "e")
+
+        assert cache.get("a") == "a2"
+        assert cache.get("e") == "e"
+        assert cache.get("b") is None
+        assert cache.get("c") is None
+
+    def test_eviction_prefers_expired_entries(self):
+        cache = _TTLCache(ttl_seconds=60, max_size=4)
+        cache.set("stale", "stale")
+        cache._data["stale"] = (time.monotonic() - 1, "stale")
+        for key in ("a", "b", "c"):
+            cache.set(key, key)
+
+        cache.set("d", "d")
+
+        # Dropping the expired entry made room, so no live key was evicted
+        assert cache.get("stale") is None
+        for key in ("a", "b", "c", "d"):
+            assert cache.get(key) == key
+
+
+class TestFormatPassedTime:
+    @pytest.mark.parametrize(
+        "passed_time, expected",
+        [
+            (30, "30.0sec"),
+            (90, "1.5mins"),
+            (7200, "2.0hours"),
+            (172800, "2.0days"),
+        ],
+    )
+    def test_units(self, passed_time, expected):
+        assert _format_passed_time(passed_time) == expected
+
+    def test_infinite_sentinel_uses_days(self):
+        # float("inf") marks "no previous thread"; it must not fall back to
+        # the seconds unit
+        assert _format_passed_time(float("inf")) == "infdays"
+
+
+class TestCheckIfMostlyEnglish:
+    def test_english_text(self):
+        assert _check_if_mostly_english("Hello there, how are you") is True
+
+    def test_arabic_text(self):
+        assert _check_if_mostly_english("السلام عليكم ورحمة الله") is False
+
+    def test_empty_string(self):
+        assert _check_if_mostly_english("") is False
+
+    @pytest.mark.parametrize("text", ["Hello world 123", "مرحبا hello يا friend", "!!??..", "abcَّ"])
+    def test_matches_per_character_count(self, text):
+        # Both the ASCII (bytes.translate) and non-ASCII (str.translate) paths
+        # must agree with the original per-character loop
+        count_in_range = sum(1 for char in text if 65 <= ord(char) <= 122)
+        expected = (count_in_range / len(text)) >= 0.8
+        assert _check_if_mostly_english(text) is expected
+
+
+class TestValidatePasswordStrength:
+    def test_strong_password_passes(self):
+        validate_password_strength("StrongPassword123!")
+
+    def test_common_password_rejected_without_zxcvbn(self):
+        with pytest.raises(HTTPException) as exc_info:
+            validate_password_strength("qwerty")
+        assert exc_info.value.status_code == 400
+
+    def test_common_password_rejected_case_insensitively(self):
+        with pytest.raises(HTTPException) as exc_info:
+            validate_password_strength("PASSWORD")
+        assert exc_info.value.status_code == 400
+
+    def test_empty_password_rejected(self):
+        with pytest.raises(HTTPException) as exc_info:
+            validate_password_strength("")
+        assert exc_info.value.status_code == 400
+
+    def test_weak_uncommon_password_rejected_by_zxcvbn(self):
+        with pytest.raises(HTTPException) as exc_info:
+            validate_password_strength("aaaa")
+        assert exc_info.value.status_code == 400